@@ -4,11 +4,17 @@ FastAPI service for job scraping and AI-powered job matching
 """
 
 import os
+import sys
 import logging
+from contextlib import asynccontextmanager
+from operator import attrgetter
 from typing import List, Dict, Optional
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
+import orjson
 import uvicorn
 from dotenv import load_dotenv
 
@@ -27,13 +33,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Initialize services
+job_scraper = JobScraper()
+ai_matcher = AIMatcher()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release shared service resources on shutdown"""
+    yield
+    await job_scraper.close()
+    await ai_matcher.close()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="AI Job Applier - Python Service",
     description="Microservice for job scraping and AI-powered job matching",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -45,9 +64,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-job_scraper = JobScraper()
-ai_matcher = AIMatcher()
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZip middleware that leaves the given paths uncompressed"""
+    
+    def __init__(self, app, excluded_paths=(), **kwargs):
+        super().__init__(app, **kwargs)
+        self.excluded_paths = frozenset(excluded_paths)
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Compress larger responses (scored job lists repeat long descriptions).
+# Streaming endpoints are excluded: the gzip responder buffers the stream
+# instead of flushing each chunk, which defeats incremental delivery.
+app.add_middleware(
+    SelectiveGZipMiddleware,
+    excluded_paths=("/score_jobs/stream",),
+    minimum_size=1024
+)
 
 @app.get("/")
 async def root():
@@ -72,9 +109,9 @@ async def health_check():
 
 @app.get("/scrape_jobs")
 async def scrape_jobs(
-    keyword: str,
-    location: str = "",
-    limit: int = 20
+    keyword: str = Query(..., min_length=1, pattern=r"\S", description="Job search keyword"),
+    location: str = Query("", description="Job location"),
+    limit: int = Query(20, ge=1, le=50, description="Maximum number of jobs to scrape")
 ):
     """
     Scrape jobs from multiple sources (JSearch API, Indeed) based on keyword and location
@@ -82,7 +119,7 @@ async def scrape_jobs(
     Args:
         keyword: Job search keyword (e.g., "software engineer")
         location: Job location (e.g., "San Francisco" or "Remote")
-        limit: Maximum number of jobs to scrape (default: 20)
+        limit: Maximum number of jobs to scrape (1-50, default: 20)
     
     Returns:
         Dictionary containing scraped jobs and metadata
@@ -90,25 +127,24 @@ async def scrape_jobs(
     try:
         logger.info(f"🔍 Starting job scrape: keyword='{keyword}', location='{location}', limit={limit}")
         
-        if not keyword.strip():
-            raise HTTPException(status_code=400, detail="Keyword is required")
-        
-        # Scrape jobs using the job scraper service
+        # Query validation has already rejected blank keywords and out-of-range limits
         jobs = await job_scraper.scrape_jobs(
-            keyword=keyword.strip(),
-            location=location.strip(),
-            limit=min(limit, 50)  # Cap at 50 jobs
+            keyword=keyword,
+            location=location,
+            limit=limit
         )
         
         logger.info(f"✅ Successfully scraped {len(jobs)} jobs")
         
-        return {
+        # Return the response directly so orjson serializes the job list in
+        # one pass, skipping FastAPI's jsonable_encoder walk
+        return ORJSONResponse({
             "jobs": jobs,
             "count": len(jobs),
             "keyword": keyword,
             "location": location,
             "sources": ["jsearch", "indeed", "mock"]
-        }
+        })
         
     except Exception as e:
         logger.error(f"❌ Job scraping failed: {str(e)}")
@@ -140,24 +176,24 @@ async def score_jobs(request: ScoreJobsRequest):
         # Score jobs using AI matcher service
         scored_jobs = await ai_matcher.score_jobs(
             resume_url=request.resume_url,
-            jobs=request.jobs,
+            jobs=[job.model_dump() for job in request.jobs],
             user_skills=request.user_skills or [],
             user_experience=request.user_experience or ""
         )
         
         # Sort by fit score (highest first)
-        scored_jobs.sort(key=lambda job: job.fit_score, reverse=True)
+        scored_jobs.sort(key=attrgetter("fit_score"), reverse=True)
         
         logger.info(f"✅ Successfully scored {len(scored_jobs)} jobs")
         
         # Convert to dict for JSON serialization
-        scored_jobs_dict = [job.dict() for job in scored_jobs]
+        scored_jobs_dict = [job.model_dump() for job in scored_jobs]
         
-        return {
+        return ORJSONResponse({
             "scored_jobs": scored_jobs_dict,
             "count": len(scored_jobs_dict),
             "average_score": sum(job.fit_score for job in scored_jobs) / len(scored_jobs) if scored_jobs else 0
-        }
+        })
         
     except Exception as e:
         logger.error(f"❌ Job scoring failed: {str(e)}")
@@ -166,6 +202,38 @@ async def score_jobs(request: ScoreJobsRequest):
             detail=f"Job scoring failed: {str(e)}"
         )
 
+@app.post("/score_jobs/stream")
+async def score_jobs_stream(request: ScoreJobsRequest):
+    """
+    Score jobs based on user profile using AI, streaming results as they complete
+    
+    Args:
+        request: ScoreJobsRequest containing resume_url, jobs, user_skills, user_experience
+    
+    Returns:
+        Newline-delimited JSON stream of scored jobs, one per line. Jobs are
+        emitted in completion order, so clients should sort by fit_score.
+    """
+    if not request.jobs:
+        raise HTTPException(status_code=400, detail="Jobs list is required")
+    
+    if not request.resume_url:
+        raise HTTPException(status_code=400, detail="Resume URL is required")
+    
+    logger.info(f"🤖 Starting streamed AI job scoring for {len(request.jobs)} jobs")
+    
+    async def generate_scored_jobs():
+        async for batch in ai_matcher.stream_scored_jobs(
+            resume_url=request.resume_url,
+            jobs=[job.model_dump() for job in request.jobs],
+            user_skills=request.user_skills or [],
+            user_experience=request.user_experience or ""
+        ):
+            for job in batch:
+                yield orjson.dumps(job.model_dump()) + b"\n"
+    
+    return StreamingResponse(generate_scored_jobs(), media_type="application/x-ndjson")
+
 @app.post("/test_ai")
 async def test_ai():
     """Test endpoint to verify AI service connectivity"""
@@ -178,10 +246,16 @@ async def test_ai():
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
+    reload = os.getenv("ENVIRONMENT", "development") == "development"
     uvicorn.run(
         "main:app", 
         host="0.0.0.0", 
         port=port, 
-        reload=True,
+        reload=reload,
+        # Reload runs a single process; outside development use one worker per core
+        workers=None if reload else int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1)),
+        # uvloop is not available on Windows; fall back to the default asyncio loop there
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         log_level="info"
     )
\ No newline at end of file
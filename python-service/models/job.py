@@ -12,21 +12,11 @@ class Job(BaseModel):
     description: str = Field(..., description="Job description")
     location: Optional[str] = Field(None, description="Job location")
     source_url: Optional[str] = Field(None, description="Original job posting URL")
-    
-    class Config:
-        json_encoders = {
-            # Add custom encoders if needed
-        }
 
 class ScoredJob(Job):
     """Extended job model with AI fit score"""
     fit_score: int = Field(..., description="AI-generated fit score (0-100)")
     score_explanation: Optional[str] = Field(None, description="Explanation for the fit score")
-    
-    class Config:
-        json_encoders = {
-            # Add custom encoders if needed
-        }
 
 class JobSearchCriteria(BaseModel):
     """Model for job search parameters"""
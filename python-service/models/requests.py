@@ -2,8 +2,8 @@
 Request models for API endpoints
 """
 
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field, HttpUrl
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field, HttpUrl
 from models.job import Job
 
 class ScrapeJobsRequest(BaseModel):
@@ -15,12 +15,12 @@ class ScrapeJobsRequest(BaseModel):
 class ScoreJobsRequest(BaseModel):
     """Request model for job scoring endpoint"""
     resume_url: str = Field(..., description="URL to user's resume")
-    jobs: List[Dict[str, Any]] = Field(..., description="List of jobs to score")
+    jobs: List[Job] = Field(..., description="List of jobs to score")
     user_skills: Optional[List[str]] = Field([], description="User's skills")
     user_experience: Optional[str] = Field("", description="User's experience summary")
     
-    class Config:
-        schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "resume_url": "https://example.com/resume.pdf",
                 "jobs": [
@@ -35,4 +35,5 @@ class ScoreJobsRequest(BaseModel):
                 "user_skills": ["Python", "JavaScript", "React"],
                 "user_experience": "5 years of software development experience"
             }
-        }
\ No newline at end of file
+        }
+    )
\ No newline at end of file
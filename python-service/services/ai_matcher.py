@@ -6,15 +6,80 @@ Uses OpenAI or Claude API to score job fit based on user profile
 import asyncio
 import logging
 import os
-from typing import List, Dict, Any, Optional
-import requests
-from openai import AsyncOpenAI
-import anthropic
+from typing import List, Dict, Any, AsyncIterator, Optional
+import httpx
+import orjson
+from cachetools import TTLCache
 
 from models.job import Job, ScoredJob
 
 logger = logging.getLogger(__name__)
 
+# Number of jobs sent to the AI provider per request
+_BATCH_SIZE = 15
+
+# Structured output shape for AI scoring responses
+_SCORES_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "scores": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "job_index": {"type": "integer", "description": "Job number from the prompt"},
+                    "score": {"type": "integer", "description": "Fit score from 0-100"},
+                    "explanation": {"type": "string", "description": "Brief explanation"}
+                },
+                "required": ["job_index", "score", "explanation"]
+            }
+        }
+    },
+    "required": ["scores"]
+}
+
+_SCORES_TOOL = {
+    "name": "record_job_scores",
+    "description": "Record the fit score and explanation for each job",
+    "input_schema": _SCORES_SCHEMA
+}
+
+# Fixed parts of the job scoring prompt
+_PROMPT_HEADER = """
+Please analyze the following job postings against this candidate's profile and provide fit scores from 0-100 for each job.
+
+CANDIDATE PROFILE:
+"""
+
+_PROFILE_TMPL = """Skills: {skills}
+Experience: {experience}
+Resume: {resume}
+
+JOBS TO SCORE:
+"""
+
+_JOB_TMPL = """
+Job {index}:
+Title: {title}
+Company: {company}
+Description: {description}...
+Location: {location}
+
+"""
+
+_PROMPT_FOOTER = """
+For each job, provide a score from 0-100 where:
+- 90-100: Excellent match (perfect skills alignment, ideal role)
+- 80-89: Very good match (strong skills overlap, good role fit)
+- 70-79: Good match (decent skills alignment, some missing elements)
+- 60-69: Fair match (some relevant skills, role partially suitable)
+- 50-59: Below average match (limited relevance)
+- 0-49: Poor match (little to no alignment)
+
+Respond with a JSON object containing one entry per job, in this exact format:
+{"scores": [{"job_index": 1, "score": 87, "explanation": "brief explanation"}, ...]}
+"""
+
 class AIMatcher:
     """Service for AI-powered job matching and scoring"""
     
@@ -22,16 +87,50 @@ class AIMatcher:
         self.openai_client = None
         self.claude_client = None
         
+        # Shared async HTTP client for resume downloads and AI provider calls,
+        # pooled and HTTP/2 so concurrent batches don't queue for connections
+        self._http_client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            timeout=60
+        )
+        
+        # Cache of extracted resume content, keyed by resume URL
+        self._resume_cache: TTLCache = TTLCache(
+            maxsize=256,
+            ttl=int(os.getenv("RESUME_CACHE_TTL", 3600))
+        )
+        # Downloads in progress, so concurrent requests for a URL share one.
+        # Each lock is kept only while some caller holds or waits on it.
+        self._resume_locks: Dict[str, asyncio.Lock] = {}
+        self._resume_lock_users: Dict[str, int] = {}
+        
+        # Limit concurrent AI batch requests to respect provider rate limits
+        self._batch_semaphore = asyncio.Semaphore(int(os.getenv("AI_MAX_CONCURRENT_BATCHES", 4)))
+        
         # Initialize OpenAI client if API key is available
         openai_key = os.getenv("OPENAI_API_KEY")
         if openai_key:
-            self.openai_client = AsyncOpenAI(api_key=openai_key)
+            # Imported lazily so mock-mode deployments skip the SDK import cost
+            from openai import AsyncOpenAI
+            
+            self.openai_client = AsyncOpenAI(
+                api_key=openai_key,
+                timeout=60,
+                http_client=self._http_client
+            )
             logger.info("✅ OpenAI client initialized")
         
         # Initialize Claude client if API key is available
         claude_key = os.getenv("ANTHROPIC_API_KEY")
         if claude_key:
-            self.claude_client = anthropic.AsyncAnthropic(api_key=claude_key)
+            import anthropic
+            
+            self.claude_client = anthropic.AsyncAnthropic(
+                api_key=claude_key,
+                timeout=60,
+                http_client=self._http_client
+            )
             logger.info("✅ Claude client initialized")
         
         if not self.openai_client and not self.claude_client:
@@ -59,28 +158,22 @@ class AIMatcher:
         try:
             logger.info(f"Scoring {len(jobs)} jobs using AI")
             
-            # Download and extract resume content
-            resume_content = await self._extract_resume_content(resume_url)
+            profile_header = await self._build_profile_header(resume_url, user_skills, user_experience)
             
-            # Prepare user profile summary
-            user_profile = {
-                "resume_content": resume_content,
-                "skills": user_skills or [],
-                "experience": user_experience or ""
-            }
+            # Score batches concurrently; the semaphore in _score_job_batch
+            # keeps the number of in-flight API calls within rate limits
+            batches = self._split_batches(jobs)
+            results = await asyncio.gather(
+                *(self._score_job_batch(profile_header, batch) for batch in batches),
+                return_exceptions=True
+            )
             
             scored_jobs = []
-            
-            # Process jobs in batches to avoid API limits
-            batch_size = 5
-            for i in range(0, len(jobs), batch_size):
-                batch = jobs[i:i + batch_size]
-                batch_scores = await self._score_job_batch(user_profile, batch)
+            for batch, batch_scores in zip(batches, results):
+                if isinstance(batch_scores, Exception):
+                    logger.error(f"Error in batch scoring: {batch_scores}")
+                    batch_scores = self._generate_mock_scores(batch)
                 scored_jobs.extend(batch_scores)
-                
-                # Add delay between batches to respect rate limits
-                if i + batch_size < len(jobs):
-                    await asyncio.sleep(1)
             
             logger.info(f"Successfully scored {len(scored_jobs)} jobs")
             return scored_jobs
@@ -90,9 +183,76 @@ class AIMatcher:
             # Fall back to mock scoring
             return self._generate_mock_scores(jobs)
     
+    async def stream_scored_jobs(
+        self,
+        resume_url: str,
+        jobs: List[Dict[str, Any]],
+        user_skills: List[str] = None,
+        user_experience: str = ""
+    ) -> AsyncIterator[List[ScoredJob]]:
+        """
+        Score jobs based on user profile, yielding each batch as it completes
+        
+        Args:
+            resume_url: URL to user's resume
+            jobs: List of job dictionaries
+            user_skills: List of user's skills
+            user_experience: User's experience summary
+            
+        Yields:
+            Lists of ScoredJob objects, one per completed batch (unsorted)
+        """
+        logger.info(f"Streaming scores for {len(jobs)} jobs using AI")
+        
+        profile_header = await self._build_profile_header(resume_url, user_skills, user_experience)
+        
+        tasks = [
+            asyncio.ensure_future(self._score_job_batch(profile_header, batch))
+            for batch in self._split_batches(jobs)
+        ]
+        try:
+            for next_batch in asyncio.as_completed(tasks):
+                yield await next_batch
+        finally:
+            # Stop outstanding batches if the consumer goes away early
+            for task in tasks:
+                task.cancel()
+    
+    async def _build_profile_header(
+        self,
+        resume_url: str,
+        user_skills: Optional[List[str]],
+        user_experience: Optional[str]
+    ) -> str:
+        """
+        Download the resume and build the candidate profile part of the prompt
+        
+        The header is identical for every batch of a request, so it is built
+        once here and shared by all batches.
+        
+        Args:
+            resume_url: URL to user's resume
+            user_skills: List of user's skills
+            user_experience: User's experience summary
+            
+        Returns:
+            Prompt header describing the candidate
+        """
+        resume_content = await self._extract_resume_content(resume_url)
+        
+        return _PROMPT_HEADER + _PROFILE_TMPL.format(
+            skills=", ".join(user_skills) if user_skills else "Not specified",
+            experience=user_experience or "",
+            resume=resume_content
+        )
+    
+    def _split_batches(self, jobs: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Split jobs into batches to avoid API limits"""
+        return [jobs[i:i + _BATCH_SIZE] for i in range(0, len(jobs), _BATCH_SIZE)]
+    
     async def _extract_resume_content(self, resume_url: str) -> str:
         """
-        Download and extract text content from resume
+        Get resume text content, reusing a cached extraction when fresh
         
         Args:
             resume_url: URL to the resume file
@@ -100,45 +260,80 @@ class AIMatcher:
         Returns:
             Extracted text content
         """
+        cached = self._resume_cache.get(resume_url)
+        if cached is not None:
+            return cached
+        
+        # Only one download per URL at a time; concurrent callers wait for it
+        lock = self._resume_locks.setdefault(resume_url, asyncio.Lock())
+        self._resume_lock_users[resume_url] = self._resume_lock_users.get(resume_url, 0) + 1
         try:
-            logger.info(f"Downloading resume from: {resume_url}")
-            
-            response = requests.get(resume_url, timeout=30)
-            response.raise_for_status()
-            
-            # For now, return a placeholder. In production, you would:
-            # 1. Check file type (PDF, DOC, etc.)
-            # 2. Extract text using appropriate library (PyPDF2, python-docx, etc.)
-            # 3. Clean and format the extracted text
-            
-            return "Resume content extracted successfully. Skills and experience available for matching."
-            
+            async with lock:
+                cached = self._resume_cache.get(resume_url)
+                if cached is not None:
+                    return cached
+                
+                content = await self._download_resume_content(resume_url)
+                self._resume_cache[resume_url] = content
+                return content
+                
         except Exception as e:
             logger.warning(f"Could not extract resume content: {e}")
             return "Resume content not available for analysis."
+        finally:
+            # Release the lock entry once no caller holds or waits on it
+            users = self._resume_lock_users.pop(resume_url) - 1
+            if users:
+                self._resume_lock_users[resume_url] = users
+            else:
+                del self._resume_locks[resume_url]
+    
+    async def _download_resume_content(self, resume_url: str) -> str:
+        """
+        Download and extract text content from resume
+        
+        Args:
+            resume_url: URL to the resume file
+            
+        Returns:
+            Extracted text content
+        """
+        logger.info(f"Downloading resume from: {resume_url}")
+        
+        # httpx does not follow redirects by default; resume links may go via a CDN
+        response = await self._http_client.get(resume_url, timeout=30, follow_redirects=True)
+        response.raise_for_status()
+        
+        # For now, return a placeholder. In production, you would:
+        # 1. Check file type (PDF, DOC, etc.)
+        # 2. Extract text using appropriate library (PyPDF2, python-docx, etc.)
+        # 3. Clean and format the extracted text
+        
+        return "Resume content extracted successfully. Skills and experience available for matching."
     
     async def _score_job_batch(
         self, 
-        user_profile: Dict[str, Any], 
+        profile_header: str, 
         jobs: List[Dict[str, Any]]
     ) -> List[ScoredJob]:
         """
         Score a batch of jobs using AI
         
         Args:
-            user_profile: User profile information
+            profile_header: Candidate profile part of the prompt
             jobs: List of jobs to score
             
         Returns:
             List of scored jobs
         """
         try:
-            if self.openai_client:
-                return await self._score_with_openai(user_profile, jobs)
-            elif self.claude_client:
-                return await self._score_with_claude(user_profile, jobs)
-            else:
-                return self._generate_mock_scores(jobs)
+            async with self._batch_semaphore:
+                if self.openai_client:
+                    return await self._score_with_openai(profile_header, jobs)
+                elif self.claude_client:
+                    return await self._score_with_claude(profile_header, jobs)
+                else:
+                    return self._generate_mock_scores(jobs)
                 
         except Exception as e:
             logger.error(f"Error in batch scoring: {e}")
@@ -146,13 +341,17 @@ class AIMatcher:
     
     async def _score_with_openai(
         self, 
-        user_profile: Dict[str, Any], 
+        profile_header: str, 
         jobs: List[Dict[str, Any]]
     ) -> List[ScoredJob]:
         """Score jobs using OpenAI GPT"""
         try:
-            # Prepare prompt for job scoring
-            prompt = self._create_scoring_prompt(user_profile, jobs)
+            loop = asyncio.get_running_loop()
+            
+            # Prepare prompt for job scoring off the event loop
+            prompt = await loop.run_in_executor(
+                None, self._create_scoring_prompt, profile_header, jobs
+            )
             
             response = await self.openai_client.chat.completions.create(
                 model="gpt-3.5-turbo",
@@ -167,11 +366,16 @@ class AIMatcher:
                     }
                 ],
                 temperature=0.3,
-                max_tokens=1000
+                max_tokens=2000,
+                response_format={"type": "json_object"}
             )
             
+            ai_scores = orjson.loads(response.choices[0].message.content).get("scores", [])
+            
             # Parse AI response and create ScoredJob objects
-            return self._parse_ai_scores(jobs, response.choices[0].message.content)
+            return await loop.run_in_executor(
+                None, self._parse_ai_scores, jobs, ai_scores
+            )
             
         except Exception as e:
             logger.error(f"OpenAI scoring error: {e}")
@@ -179,18 +383,24 @@ class AIMatcher:
     
     async def _score_with_claude(
         self, 
-        user_profile: Dict[str, Any], 
+        profile_header: str, 
         jobs: List[Dict[str, Any]]
     ) -> List[ScoredJob]:
         """Score jobs using Claude"""
         try:
-            # Prepare prompt for job scoring
-            prompt = self._create_scoring_prompt(user_profile, jobs)
+            loop = asyncio.get_running_loop()
+            
+            # Prepare prompt for job scoring off the event loop
+            prompt = await loop.run_in_executor(
+                None, self._create_scoring_prompt, profile_header, jobs
+            )
             
             message = await self.claude_client.messages.create(
                 model="claude-3-sonnet-20240229",
-                max_tokens=1000,
+                max_tokens=2000,
                 temperature=0.3,
+                tools=[_SCORES_TOOL],
+                tool_choice={"type": "tool", "name": _SCORES_TOOL["name"]},
                 messages=[
                     {
                         "role": "user",
@@ -199,8 +409,14 @@ class AIMatcher:
                 ]
             )
             
+            ai_scores = next(
+                block.input for block in message.content if block.type == "tool_use"
+            ).get("scores", [])
+            
             # Parse AI response and create ScoredJob objects
-            return self._parse_ai_scores(jobs, message.content[0].text)
+            return await loop.run_in_executor(
+                None, self._parse_ai_scores, jobs, ai_scores
+            )
             
         except Exception as e:
             logger.error(f"Claude scoring error: {e}")
@@ -208,99 +424,71 @@ class AIMatcher:
     
     def _create_scoring_prompt(
         self, 
-        user_profile: Dict[str, Any], 
+        profile_header: str, 
         jobs: List[Dict[str, Any]]
     ) -> str:
         """
         Create a prompt for AI job scoring
         
         Args:
-            user_profile: User profile information
+            profile_header: Candidate profile part of the prompt
             jobs: List of jobs to score
             
         Returns:
             Formatted prompt string
         """
-        skills_str = ", ".join(user_profile["skills"]) if user_profile["skills"] else "Not specified"
-        
-        prompt = f"""
-Please analyze the following job postings against this candidate's profile and provide fit scores from 0-100 for each job.
-
-CANDIDATE PROFILE:
-Skills: {skills_str}
-Experience: {user_profile["experience"]}
-Resume: {user_profile["resume_content"]}
-
-JOBS TO SCORE:
-"""
-        
-        for i, job in enumerate(jobs, 1):
-            prompt += f"""
-Job {i}:
-Title: {job['title']}
-Company: {job['company']}
-Description: {job['description'][:500]}...
-Location: {job.get('location', 'Not specified')}
-
-"""
-        
-        prompt += """
-For each job, provide a score from 0-100 where:
-- 90-100: Excellent match (perfect skills alignment, ideal role)
-- 80-89: Very good match (strong skills overlap, good role fit)
-- 70-79: Good match (decent skills alignment, some missing elements)
-- 60-69: Fair match (some relevant skills, role partially suitable)
-- 50-59: Below average match (limited relevance)
-- 0-49: Poor match (little to no alignment)
-
-Respond in this exact format for each job:
-Job 1: [score] - [brief explanation]
-Job 2: [score] - [brief explanation]
-etc.
-"""
+        parts = [profile_header]
+        parts.extend(
+            _JOB_TMPL.format(
+                index=i,
+                title=job['title'],
+                company=job['company'],
+                description=job['description'][:500],
+                location=job.get('location', 'Not specified')
+            )
+            for i, job in enumerate(jobs, 1)
+        )
+        parts.append(_PROMPT_FOOTER)
         
-        return prompt
+        return "".join(parts)
     
     def _parse_ai_scores(
         self, 
         jobs: List[Dict[str, Any]], 
-        ai_response: str
+        ai_scores: List[Dict[str, Any]]
     ) -> List[ScoredJob]:
         """
         Parse AI response and create ScoredJob objects
         
         Args:
             jobs: Original job list
-            ai_response: AI scoring response
+            ai_scores: Score entries from the structured AI response
             
         Returns:
             List of ScoredJob objects
         """
         try:
-            lines = ai_response.strip().split('\n')
+            # Index scores by job number, keeping the first entry per job
+            parsed_scores = {}
+            for entry in ai_scores:
+                try:
+                    parsed_scores.setdefault(
+                        int(entry["job_index"]),
+                        (int(entry["score"]), str(entry.get("explanation") or "AI analysis completed"))
+                    )
+                except (KeyError, TypeError, ValueError):
+                    continue
+            
             scored_jobs = []
             
-            for i, job in enumerate(jobs):
-                score = 50  # Default score
-                explanation = "AI analysis completed"
-                
-                # Try to parse score from AI response
-                for line in lines:
-                    if f"Job {i+1}:" in line:
-                        parts = line.split(' - ')
-                        if len(parts) >= 2:
-                            try:
-                                score_part = parts[0].split(':')[1].strip()
-                                score = int(score_part)
-                                explanation = parts[1].strip()
-                            except:
-                                pass
-                        break
+            for i, job in enumerate(jobs, 1):
+                score, explanation = parsed_scores.get(i, (50, "AI analysis completed"))
                 
                 # Ensure score is within valid range
                 score = max(0, min(100, score))
                 
-                scored_job = ScoredJob(
+                # Jobs were validated as Job models when the request was parsed
+                scored_job = ScoredJob.model_construct(
                     title=job['title'],
                     company=job['company'],
                     description=job['description'],
@@ -330,16 +518,14 @@ etc.
         """
         logger.info("Generating mock AI scores for development")
         
-        scored_jobs = []
+        explanation = "Mock AI analysis: Good match based on job requirements and candidate profile."
         
-        for i, job in enumerate(jobs):
-            # Generate a realistic mock score based on job position
-            base_score = 85 - (i * 3)  # Decreasing scores
-            mock_score = max(40, min(95, base_score + (i % 3) * 5))
-            
-            explanation = f"Mock AI analysis: Good match based on job requirements and candidate profile."
-            
-            scored_job = ScoredJob(
+        # Generate realistic mock scores based on job position: decreasing,
+        # with a small periodic bump, clamped to 40-95
+        mock_scores = [max(40, min(95, 85 - i * 3 + (i % 3) * 5)) for i in range(len(jobs))]
+        
+        return [
+            ScoredJob.model_construct(
                 title=job['title'],
                 company=job['company'],
                 description=job['description'],
@@ -348,10 +534,12 @@ etc.
                 fit_score=mock_score,
                 score_explanation=explanation
             )
-            
-            scored_jobs.append(scored_job)
-        
-        return scored_jobs
+            for job, mock_score in zip(jobs, mock_scores)
+        ]
+    
+    async def close(self):
+        """Close the shared HTTP client used for downloads and AI providers"""
+        await self._http_client.aclose()
     
     async def test_connection(self) -> str:
         """Test AI service connectivity"""
@@ -5,22 +5,68 @@ Uses real APIs to extract job listings with fallback mechanisms
 
 import asyncio
 import logging
+import math
 import random
 import time
 import os
-from typing import List, Dict, Any, Optional
-import requests
+from functools import lru_cache
+from typing import List, Dict, Any, Awaitable, Optional, Tuple
 import aiohttp
-from urllib.parse import urlencode
+import orjson
+from cachetools import TTLCache
+from selectolax.lexbor import LexborHTMLParser, LexborNode
+from tenacity import (
+    before_sleep_log,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    stop_after_delay,
+    wait_exponential_jitter
+)
+
+from services.rate_limiter import RateLimiter
 
 logger = logging.getLogger(__name__)
 
 class JobScraper:
     """Service for scraping job listings from various job boards"""
     
+    # Approximate number of results per JSearch page
+    _JSEARCH_PAGE_SIZE = 10
+    
+    # Indeed CSS selectors, tried in order
+    _JOB_CARD_SELECTORS = (
+        'div[data-jk]',
+        '.job_seen_beacon',
+        '.jobsearch-SerpJobCard',
+        '.slider_container .slider_item'
+    )
+    _TITLE_SELECTORS = (
+        'h2.jobTitle a span',
+        'h2.jobTitle span',
+        '.jobTitle a',
+        '[data-testid="job-title"]'
+    )
+    _COMPANY_SELECTORS = (
+        '.companyName',
+        '[data-testid="company-name"]',
+        '.company'
+    )
+    _LOCATION_SELECTORS = (
+        '.companyLocation',
+        '[data-testid="job-location"]',
+        '.location'
+    )
+    _SUMMARY_SELECTORS = (
+        '.summary',
+        '.job-snippet',
+        '[data-testid="job-snippet"]'
+    )
+    
     def __init__(self):
         self.jsearch_api_key = os.getenv("JSEARCH_API_KEY")
         self.jsearch_base_url = "https://jsearch.p.rapidapi.com"
+        self.indeed_base_url = "https://www.indeed.com/jobs"
         
         # Headers for JSearch API
         self.jsearch_headers = {
@@ -28,14 +74,65 @@ class JobScraper:
             "X-RapidAPI-Host": "jsearch.p.rapidapi.com"
         }
         
-        # Session for requests
-        self.session = requests.Session()
-        self.session.headers.update({
+        # Default headers for all outgoing requests
+        self._default_headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        }
+        
+        # Shared aiohttp session, created lazily on first use
+        self._aio_session: Optional[aiohttp.ClientSession] = None
+        
+        # Cap concurrent outbound requests per host to avoid rate-limit bans
+        self._jsearch_sem = asyncio.Semaphore(int(os.getenv("JSEARCH_CONCURRENCY", 5)))
+        self._indeed_sem = asyncio.Semaphore(int(os.getenv("INDEED_CONCURRENCY", 3)))
+        
+        # Recent search results, keyed by normalized (keyword, location, limit)
+        self._results_cache: TTLCache = TTLCache(
+            maxsize=1024,
+            ttl=int(os.getenv("JOB_CACHE_TTL", 300))
+        )
+        # Upstream fetches in progress, so identical concurrent searches share one
+        self._inflight: Dict[Tuple[str, str, int], asyncio.Future] = {}
+        
+        # Optional de-duplication across searches, for feed-style callers that
+        # only want jobs they haven't seen before. Bloom filters are
+        # probabilistic: a false positive occasionally hides a new job.
+        self._seen_bloom = None
+        if os.getenv("ENABLE_CROSS_CALL_DEDUP", "false").lower() == "true":
+            from pybloom_live import ScalableBloomFilter
+            
+            self._seen_bloom = ScalableBloomFilter(initial_capacity=100_000, error_rate=1e-4)
+        
+        # Keep JSearch calls within the RapidAPI plan quota. The limiter is
+        # per process, so each uvicorn worker gets its own JSEARCH_RPS budget.
+        self._jsearch_limiter = RateLimiter(
+            rate=float(os.getenv("JSEARCH_RPS", 5)),
+            max_tokens=int(os.getenv("JSEARCH_BURST", 5))
+        )
+        # Monotonic time before which Indeed requests wait, set after a 429/503
+        self._indeed_backoff_until = 0.0
         
         logger.info("JobScraper initialized with API integrations")
     
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared aiohttp session, creating it on first use"""
+        if self._aio_session is None or self._aio_session.closed:
+            self._aio_session = aiohttp.ClientSession(
+                headers=self._default_headers,
+                connector=aiohttp.TCPConnector(
+                    limit=100,
+                    limit_per_host=20,
+                    ttl_dns_cache=300,
+                    keepalive_timeout=60
+                )
+            )
+        return self._aio_session
+    
+    async def close(self):
+        """Close the shared aiohttp session"""
+        if self._aio_session is not None:
+            await self._aio_session.close()
+    
     async def scrape_jobs(
         self, 
         keyword: str, 
@@ -45,6 +142,10 @@ class JobScraper:
         """
         Scrape jobs from multiple sources with fallback
         
+        Results are cached for JOB_CACHE_TTL seconds (unless cross-search
+        de-duplication is enabled), and concurrent identical searches share a
+        single upstream fetch.
+        
         Args:
             keyword: Job search keyword
             location: Job location
@@ -53,37 +154,119 @@ class JobScraper:
         Returns:
             List of job dictionaries
         """
-        all_jobs = []
+        # Trim once so padded and unpadded searches share results and queries
+        keyword = keyword.strip()
+        location = location.strip()
+        cache_key = (keyword.lower(), location.lower(), limit)
+        
+        # Cached results were all marked as seen when first returned, so the
+        # cache is bypassed while cross-search de-duplication is enabled
+        use_cache = self._seen_bloom is None
+        
+        cached_jobs = self._results_cache.get(cache_key) if use_cache else None
+        if cached_jobs is not None:
+            logger.info(f"Returning {len(cached_jobs)} cached jobs")
+            return list(cached_jobs)
+        
+        fetch = self._inflight.get(cache_key)
+        if fetch is None:
+            fetch = asyncio.ensure_future(self._fetch_jobs(keyword, location, limit))
+            self._inflight[cache_key] = fetch
+            fetch.add_done_callback(lambda _: self._inflight.pop(cache_key, None))
         
         try:
-            # Try JSearch API first (more reliable)
-            if self.jsearch_api_key:
-                logger.info("Fetching jobs from JSearch API")
-                jsearch_jobs = await self._scrape_jsearch_jobs(keyword, location, limit)
-                all_jobs.extend(jsearch_jobs)
-                logger.info(f"JSearch API returned {len(jsearch_jobs)} jobs")
-            
-            # If we need more jobs, try Indeed scraping
-            if len(all_jobs) < limit:
-                remaining = limit - len(all_jobs)
-                logger.info(f"Fetching {remaining} additional jobs from Indeed")
-                indeed_jobs = await self._scrape_indeed_jobs(keyword, location, remaining)
-                all_jobs.extend(indeed_jobs)
-                logger.info(f"Indeed scraping returned {len(indeed_jobs)} jobs")
-            
-            # Remove duplicates based on title and company
-            unique_jobs = self._remove_duplicates(all_jobs)
-            
-            # Limit to requested number
-            final_jobs = unique_jobs[:limit]
-            
-            logger.info(f"Total unique jobs found: {len(final_jobs)}")
-            return final_jobs
+            # Shield the shared fetch so one cancelled caller doesn't cancel it for all
+            final_jobs = await asyncio.shield(fetch)
             
         except Exception as e:
             logger.error(f"Error in job scraping: {e}")
             # Fallback to mock data
             return self._get_mock_jobs(keyword, location, limit)
+        
+        if final_jobs and use_cache:
+            self._results_cache[cache_key] = final_jobs
+        return list(final_jobs)
+    
+    async def _fetch_jobs(
+        self, 
+        keyword: str, 
+        location: str, 
+        limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch jobs from all sources, de-duplicated and trimmed to the limit
+        
+        Args:
+            keyword: Job search keyword
+            location: Job location
+            limit: Maximum number of jobs to scrape
+            
+        Returns:
+            List of job dictionaries
+        """
+        # Query all sources concurrently and consume results as each source
+        # completes, so a fast source isn't held up by a slow one
+        fetchers = {}
+        if self.jsearch_api_key:
+            fetchers["jsearch"] = self._scrape_jsearch_jobs(keyword, location, limit)
+        fetchers["indeed"] = self._scrape_indeed_jobs(keyword, location, limit)
+        
+        logger.info(f"Fetching jobs from: {', '.join(fetchers)}")
+        tasks = [
+            asyncio.create_task(self._fetch_source(source, fetch))
+            for source, fetch in fetchers.items()
+        ]
+        
+        # De-duplicate on title and company as results arrive; the first
+        # source to return a job wins
+        jobs_by_key: Dict[str, Dict[str, Any]] = {}
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                source, source_jobs = await next_result
+                logger.info(f"{source} returned {len(source_jobs)} jobs")
+                for job in source_jobs:
+                    # Drop jobs already returned by earlier searches
+                    if self._seen_bloom is not None and job["_dedup_key"] in self._seen_bloom:
+                        continue
+                    jobs_by_key.setdefault(job["_dedup_key"], job)
+                
+                # Enough jobs collected; don't wait on the slower sources
+                if len(jobs_by_key) >= limit:
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+        
+        # Limit to requested number
+        final_jobs = list(jobs_by_key.values())[:limit]
+        for job in final_jobs:
+            dedup_key = job.pop("_dedup_key")
+            if self._seen_bloom is not None:
+                self._seen_bloom.add(dedup_key)
+        
+        logger.info(f"Total unique jobs found: {len(final_jobs)}")
+        return final_jobs
+    
+    async def _fetch_source(
+        self,
+        source: str,
+        fetch: Awaitable[List[Dict[str, Any]]]
+    ) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Await one source's fetch, tagging the result with the source name
+        
+        Args:
+            source: Source name, used for logging
+            fetch: Awaitable returning the source's jobs
+            
+        Returns:
+            Tuple of source name and its jobs (empty if the fetch failed)
+        """
+        try:
+            return source, await fetch
+        except Exception as e:
+            logger.error(f"Error fetching {source} jobs: {e}")
+            return source, []
     
     async def _scrape_jsearch_jobs(
         self, 
@@ -107,46 +290,119 @@ class JobScraper:
                 logger.warning("JSearch API key not found")
                 return []
             
-            # Prepare search parameters
-            params = {
-                "query": f"{keyword} {location}".strip(),
-                "page": "1",
-                "num_pages": "1",
-                "date_posted": "all"
-            }
+            # JSearch returns about 10 jobs per page; fetch the pages concurrently
+            n_pages = math.ceil(limit / self._JSEARCH_PAGE_SIZE)
+            session = await self._get_session()
+            pages = await asyncio.gather(
+                *(
+                    self._fetch_jsearch_page(session, keyword, location, page)
+                    for page in range(1, n_pages + 1)
+                ),
+                return_exceptions=True
+            )
+            
+            jobs_data = []
+            for page_items in pages:
+                if isinstance(page_items, Exception):
+                    logger.error(f"JSearch page request failed: {page_items}")
+                    continue
+                jobs_data.extend(page_items)
             
-            url = f"{self.jsearch_base_url}/search"
+            jobs = []
+            for job_item in jobs_data[:limit]:
+                try:
+                    job = self._parse_jsearch_job(job_item)
+                    if job:
+                        jobs.append(job)
+                except Exception as e:
+                    logger.warning(f"Error parsing JSearch job: {e}")
+                    continue
+            
+            return jobs
             
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    url, 
-                    headers=self.jsearch_headers, 
-                    params=params,
-                    timeout=30
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        jobs_data = data.get("data", [])
-                        
-                        jobs = []
-                        for job_item in jobs_data[:limit]:
-                            try:
-                                job = self._parse_jsearch_job(job_item)
-                                if job:
-                                    jobs.append(job)
-                            except Exception as e:
-                                logger.warning(f"Error parsing JSearch job: {e}")
-                                continue
-                        
-                        return jobs
-                    else:
-                        logger.error(f"JSearch API error: {response.status}")
-                        return []
-                        
         except Exception as e:
             logger.error(f"JSearch API request failed: {e}")
             return []
     
+    @retry(
+        # Give up after 3 attempts or once retrying has taken 20s, so the worst
+        # case (plus the final 15s attempt) stays well inside the backend's
+        # 60s request timeout and the mock fallback still gets a chance
+        stop=stop_after_attempt(3) | stop_after_delay(20),
+        wait=wait_exponential_jitter(initial=0.5, max=8),
+        retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError)),
+        before_sleep=before_sleep_log(logger, logging.WARNING),
+        reraise=True
+    )
+    async def _fetch_jsearch_page(
+        self,
+        session: aiohttp.ClientSession,
+        keyword: str,
+        location: str,
+        page: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch one page of raw results from the JSearch API
+        
+        Args:
+            session: Shared aiohttp session
+            keyword: Job search keyword
+            location: Job location
+            page: 1-based page number
+            
+        Returns:
+            List of raw job items from the API response
+            
+        Raises:
+            aiohttp.ClientError: Network failure or 5xx response, raised once
+                retries are exhausted
+            asyncio.TimeoutError: Request timed out on every attempt
+        """
+        # Prepare search parameters (cached, saved searches repeat often)
+        params = self._jsearch_params(keyword, location, page)
+        
+        url = f"{self.jsearch_base_url}/search"
+        
+        async with self._jsearch_sem:
+            await self._jsearch_limiter.wait_for_token()
+            async with session.get(
+                url, 
+                headers=self.jsearch_headers, 
+                params=params,
+                timeout=15
+            ) as response:
+                if response.status == 200:
+                    data = await response.json(loads=orjson.loads)
+                    return data.get("data", [])
+                elif response.status >= 500:
+                    # Transient server error; raise so the page is retried
+                    response.raise_for_status()
+                else:
+                    # Client errors (401/403/429) are not retried
+                    logger.error(f"JSearch API error: {response.status}")
+                    return []
+    
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _jsearch_params(keyword: str, location: str, page: int) -> Tuple[Tuple[str, str], ...]:
+        """
+        Build JSearch query parameters for one results page
+        
+        Args:
+            keyword: Job search keyword
+            location: Job location
+            page: 1-based page number
+            
+        Returns:
+            Immutable sequence of (name, value) query parameter pairs
+        """
+        return (
+            ("query", f"{keyword} {location}".strip()),
+            ("page", str(page)),
+            ("num_pages", "1"),
+            ("date_posted", "all")
+        )
+    
     def _parse_jsearch_job(self, job_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Parse job data from JSearch API response
@@ -158,34 +414,36 @@ class JobScraper:
             Parsed job dictionary or None
         """
         try:
-            title = job_data.get("job_title", "").strip()
-            company = job_data.get("employer_name", "").strip()
-            description = job_data.get("job_description", "").strip()
-            location = job_data.get("job_city", "")
-            state = job_data.get("job_state", "")
-            country = job_data.get("job_country", "")
-            
-            # Combine location parts
-            location_parts = [loc for loc in [location, state, country] if loc]
-            full_location = ", ".join(location_parts)
-            
-            source_url = job_data.get("job_apply_link") or job_data.get("job_url", "")
+            get = job_data.get
+            title = get("job_title", "").strip()
+            company = get("employer_name", "").strip()
             
-            # Validate required fields
+            # Validate required fields before doing any further work
             if not title or not company:
                 return None
             
-            # Clean description
+            description = get("job_description", "").strip()
+            
+            # Clean description; only slice when it is over the length limit
             if not description:
                 description = f"Job opportunity at {company} for {title} position."
+            elif len(description) > 1000:
+                description = description[:1000]
+            
+            # Combine location parts
+            full_location = ", ".join(filter(None, (get("job_city"), get("job_state"), get("job_country"))))
+            
+            source_url = get("job_apply_link") or get("job_url") or ""
             
             return {
                 "title": title,
                 "company": company,
-                "description": description[:1000],  # Limit description length
+                "description": description,
                 "location": full_location,
                 "source_url": source_url,
-                "source": "jsearch"
+                "source": "jsearch",
+                # De-duplication key, removed before results are returned
+                "_dedup_key": f"{title.lower()}|{company.lower()}"
             }
             
         except Exception as e:
@@ -210,59 +468,32 @@ class JobScraper:
             List of job dictionaries
         """
         try:
-            from bs4 import BeautifulSoup
-            
             logger.info(f"Scraping Indeed for: {keyword} in {location}")
             
-            jobs = []
-            
-            # Build Indeed search URL
-            params = {
-                'q': keyword,
-                'l': location,
-                'start': 0,
-                'limit': min(50, limit)
-            }
-            
-            base_url = "https://www.indeed.com/jobs"
-            search_url = f"{base_url}?{urlencode(params)}"
-            
-            logger.info(f"Fetching: {search_url}")
-            
-            # Add delay to avoid rate limiting
-            await asyncio.sleep(random.uniform(1, 3))
-            
-            response = self.session.get(search_url, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Look for job cards with different selectors
-            job_selectors = [
-                'div[data-jk]',
-                '.job_seen_beacon',
-                '.jobsearch-SerpJobCard',
-                '.slider_container .slider_item'
-            ]
-            
-            job_cards = []
-            for selector in job_selectors:
-                job_cards = soup.select(selector)
-                if job_cards:
-                    break
-            
-            if not job_cards:
-                logger.warning("No job cards found on Indeed page")
-                return []
+            # Build Indeed search parameters (cached, saved searches repeat often)
+            params = self._indeed_params(keyword, location, min(50, limit))
+            
+            session = await self._get_session()
+            async with self._indeed_sem:
+                # Only delay while backing off from a recent rate-limit response
+                now = time.monotonic()
+                if now < self._indeed_backoff_until:
+                    await asyncio.sleep(self._indeed_backoff_until - now)
+                
+                # Let aiohttp encode the query string straight onto its URL object
+                async with session.get(
+                    self.indeed_base_url,
+                    params=params,
+                    timeout=aiohttp.ClientTimeout(total=30)
+                ) as response:
+                    logger.info(f"Fetching: {response.url}")
+                    if response.status in (429, 503):
+                        self._indeed_backoff_until = time.monotonic() + random.uniform(5, 15)
+                    response.raise_for_status()
+                    html = await response.text()
             
-            for card in job_cards[:limit]:
-                try:
-                    job_data = self._extract_indeed_job_from_card(card)
-                    if job_data:
-                        jobs.append(job_data)
-                except Exception as e:
-                    logger.warning(f"Error extracting Indeed job from card: {e}")
-                    continue
+            # HTML parsing is CPU-bound, so keep it off the event loop
+            jobs = await asyncio.to_thread(self._parse_indeed_html, html, limit)
             
             logger.info(f"Indeed scraping returned {len(jobs)} jobs")
             return jobs
@@ -271,76 +502,108 @@ class JobScraper:
             logger.error(f"Error scraping Indeed jobs: {e}")
             return []
     
-    def _extract_indeed_job_from_card(self, card) -> Optional[Dict[str, Any]]:
+    @staticmethod
+    @lru_cache(maxsize=512)
+    def _indeed_params(keyword: str, location: str, limit: int) -> Tuple[Tuple[str, str], ...]:
+        """
+        Build Indeed search query parameters
+        
+        Args:
+            keyword: Job search keyword
+            location: Job location
+            limit: Maximum number of jobs (at most 50)
+            
+        Returns:
+            Immutable sequence of (name, value) query parameter pairs
+        """
+        return (
+            ("q", keyword),
+            ("l", location),
+            ("start", "0"),
+            ("limit", str(limit))
+        )
+    
+    def _parse_indeed_html(self, html: str, limit: int) -> List[Dict[str, Any]]:
+        """
+        Parse job listings from an Indeed search results page
+        
+        Args:
+            html: Raw HTML of the search results page
+            limit: Maximum number of jobs
+            
+        Returns:
+            List of job dictionaries
+        """
+        tree = LexborHTMLParser(html)
+        
+        # Look for job cards with different selectors
+        job_cards = []
+        for selector in self._JOB_CARD_SELECTORS:
+            job_cards = tree.css(selector)
+            if job_cards:
+                break
+        
+        if not job_cards:
+            logger.warning("No job cards found on Indeed page")
+            return []
+        
+        jobs = []
+        for card in job_cards[:limit]:
+            try:
+                job_data = self._extract_indeed_job_from_card(card)
+                if job_data:
+                    jobs.append(job_data)
+            except Exception as e:
+                logger.warning(f"Error extracting Indeed job from card: {e}")
+                continue
+        
+        return jobs
+    
+    def _extract_indeed_job_from_card(self, card: LexborNode) -> Optional[Dict[str, Any]]:
         """
         Extract job information from an Indeed job card
         
         Args:
-            card: BeautifulSoup element representing a job card
+            card: Parsed HTML node representing a job card
             
         Returns:
             Dictionary with job information or None
         """
         try:
             # Extract job title with multiple selectors
-            title_selectors = [
-                'h2.jobTitle a span',
-                'h2.jobTitle span',
-                '.jobTitle a',
-                '[data-testid="job-title"]'
-            ]
-            
             title = ""
-            for selector in title_selectors:
-                title_elem = card.select_one(selector)
+            for selector in self._TITLE_SELECTORS:
+                title_elem = card.css_first(selector)
                 if title_elem:
-                    title = title_elem.get_text(strip=True)
+                    title = title_elem.text(strip=True)
                     break
             
             # Extract company name
-            company_selectors = [
-                '.companyName',
-                '[data-testid="company-name"]',
-                '.company'
-            ]
-            
             company = ""
-            for selector in company_selectors:
-                company_elem = card.select_one(selector)
+            for selector in self._COMPANY_SELECTORS:
+                company_elem = card.css_first(selector)
                 if company_elem:
-                    company = company_elem.get_text(strip=True)
+                    company = company_elem.text(strip=True)
                     break
             
             # Extract location
-            location_selectors = [
-                '.companyLocation',
-                '[data-testid="job-location"]',
-                '.location'
-            ]
-            
             location = ""
-            for selector in location_selectors:
-                location_elem = card.select_one(selector)
+            for selector in self._LOCATION_SELECTORS:
+                location_elem = card.css_first(selector)
                 if location_elem:
-                    location = location_elem.get_text(strip=True)
+                    location = location_elem.text(strip=True)
                     break
             
             # Extract job description/summary
-            summary_selectors = [
-                '.summary',
-                '.job-snippet',
-                '[data-testid="job-snippet"]'
-            ]
-            
             description = ""
-            for selector in summary_selectors:
-                summary_elem = card.select_one(selector)
+            for selector in self._SUMMARY_SELECTORS:
+                summary_elem = card.css_first(selector)
                 if summary_elem:
-                    description = summary_elem.get_text(strip=True)
+                    description = summary_elem.text(strip=True)
                     break
             
             # Extract job URL
-            job_key = card.get('data-jk')
+            job_key = card.attributes.get('data-jk')
             source_url = f"https://www.indeed.com/viewjob?jk={job_key}" if job_key else ""
             
             # Validate required fields
@@ -357,36 +620,15 @@ class JobScraper:
                 "description": description[:1000],  # Limit description length
                 "location": location,
                 "source_url": source_url,
-                "source": "indeed"
+                "source": "indeed",
+                # De-duplication key, removed before results are returned
+                "_dedup_key": f"{title.lower()}|{company.lower()}"
             }
             
         except Exception as e:
             logger.warning(f"Error extracting Indeed job data from card: {e}")
             return None
     
-    def _remove_duplicates(self, jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """
-        Remove duplicate jobs based on title and company
-        
-        Args:
-            jobs: List of job dictionaries
-            
-        Returns:
-            List of unique jobs
-        """
-        seen = set()
-        unique_jobs = []
-        
-        for job in jobs:
-            # Create a key based on title and company (normalized)
-            key = f"{job['title'].lower().strip()}|{job['company'].lower().strip()}"
-            
-            if key not in seen:
-                seen.add(key)
-                unique_jobs.append(job)
-        
-        return unique_jobs
-    
     def _get_mock_jobs(self, keyword: str, location: str, limit: int) -> List[Dict[str, Any]]:
         """
         Generate mock job data for development/testing
@@ -411,25 +653,36 @@ class JobScraper:
             "Senior", "Junior", "Lead", "Principal", "Staff"
         ]
         
+        locations = ["San Francisco, CA", "New York, NY", "Seattle, WA", "Austin, TX", "Remote"]
+        
+        n = min(limit, 15)  # Generate up to 15 mock jobs
+        
+        # Loop invariants. The description is split around the company name
+        # rather than formatted, so braces in the keyword are left alone.
+        title_suffix = f" {keyword.title()}"
+        desc_prefix = f"We are looking for a skilled {keyword} to join our team at "
+        desc_suffix = (
+            f". The ideal candidate will have experience in {keyword.lower()} and related technologies. "
+            f"This is a great opportunity to work with cutting-edge technology and grow your career. "
+            f"Responsibilities include developing software solutions, collaborating with cross-functional teams, "
+            f"and contributing to our innovative products."
+        )
+        
         mock_jobs = []
         
-        for i in range(min(limit, 15)):  # Generate up to 15 mock jobs
-            company = random.choice(companies)
-            job_type = random.choice(job_types)
-            
-            mock_job = {
-                "title": f"{job_type} {keyword.title()}",
+        for i, (company, job_type, job_location) in enumerate(zip(
+            random.choices(companies, k=n),
+            random.choices(job_types, k=n),
+            [location] * n if location else random.choices(locations, k=n)
+        )):
+            mock_jobs.append({
+                "title": job_type + title_suffix,
                 "company": company,
-                "description": f"We are looking for a skilled {keyword} to join our team at {company}. "
-                             f"The ideal candidate will have experience in {keyword.lower()} and related technologies. "
-                             f"This is a great opportunity to work with cutting-edge technology and grow your career. "
-                             f"Responsibilities include developing software solutions, collaborating with cross-functional teams, "
-                             f"and contributing to our innovative products.",
-                "location": location or random.choice(["San Francisco, CA", "New York, NY", "Seattle, WA", "Austin, TX", "Remote"]),
+                "description": desc_prefix + company + desc_suffix,
+                "location": job_location,
                 "source_url": f"https://example.com/job/{i+1}",
                 "source": "mock"
-            }
-            mock_jobs.append(mock_job)
+            })
             
         return mock_jobs
 
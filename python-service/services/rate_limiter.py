@@ -0,0 +1,47 @@
+"""
+Token-bucket rate limiter for outbound API requests
+Keeps request bursts within a provider's quota
+"""
+
+import asyncio
+import time
+
+class RateLimiter:
+    """Async token-bucket rate limiter"""
+
+    def __init__(self, rate: float, max_tokens: int):
+        """
+        Args:
+            rate: Tokens added per second (sustained requests per second)
+            max_tokens: Bucket capacity (largest allowed burst)
+            
+        Raises:
+            ValueError: If rate is not positive or max_tokens is below 1
+        """
+        if rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        if max_tokens < 1:
+            raise ValueError(f"max_tokens must be at least 1, got {max_tokens}")
+        
+        self.rate = rate
+        self.max_tokens = max_tokens
+        self.tokens = float(max_tokens)
+        self.updated_at = time.monotonic()
+
+    async def wait_for_token(self):
+        """Wait until a token is available, then consume it"""
+        while True:
+            self._add_new_tokens()
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+
+            # Sleep just long enough for the next token to accumulate
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def _add_new_tokens(self):
+        """Refill the bucket based on time elapsed since the last refill"""
+        now = time.monotonic()
+        new_tokens = (now - self.updated_at) * self.rate
+        self.tokens = min(self.tokens + new_tokens, self.max_tokens)
+        self.updated_at = now